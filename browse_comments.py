@@ -1,58 +1,66 @@
 #!/usr/bin/env python3
 """
 Convert preprocessed events from the SQLite DB to Markdown files per repo, organized by date.
-Uses normalized cleaned table: JOIN with events for metadata. Output is always fresh (overwrites and removes stale files).
+Reads the materialized metadata columns of the cleaned table (no JOIN with events, no event_data decode).
+Output is always fresh (overwrites and removes stale files).
 """
-import json
 import sqlite3
+from contextlib import closing
 from pathlib import Path
 from collections import defaultdict
+from itertools import groupby
 from typing import List
 
 from project_config import DATA_DIR, db_path
-from preprocessing.workflow import metadata_from_raw_event
 
+try:
+    import orjson as _json  # optional C parser; same loads() API as stdlib json
+except ImportError:
+    import json as _json
 
-def _repo_from_record(rec: dict) -> str:
-    """Repo name from record."""
-    repo = rec.get("repo")
-    if isinstance(repo, str):
-        return repo
-    return (repo or {}).get("name") or ""
+# owner/repo -> owner_repo.md; also maps path separators a repo label must never introduce.
+_SAFE_REPO = str.maketrans({"/": "_", "\\": "_", ":": "_"})
+
+
+def _record_sort_key(rec: dict) -> tuple[str, str]:
+    return (rec.get("created_at") or "", str(rec.get("id") or ""))
 
 
 def load_records_by_repo(db_path: Path) -> dict[str, List[dict]]:
-    """Load records from cleaned JOIN events (normalized schema)."""
-    conn = sqlite3.connect(str(db_path))
-    cursor = conn.execute(
-        """SELECT c.id, c.cleaned_text, c.tokens, e.event_data
-           FROM cleaned c
-           INNER JOIN events e ON e.id = c.id"""
-    )
-    rows = list(cursor)
-    conn.close()
-    records = []
-    for _id, cleaned_text, tokens_str, event_data_str in rows:
-        try:
-            event_data = json.loads(event_data_str)
-            meta = metadata_from_raw_event(event_data)
-            tokens = json.loads(tokens_str) if tokens_str else []
-            rec = {
-                "id": _id,
-                "cleaned_text": cleaned_text or "",
-                "repo": meta["repo"],
-                "created_at": meta["created_at"],
-                "type": meta["type"],
-                "author_association": meta["author_association"],
-                "tokens": tokens,
-            }
-            records.append(rec)
-        except (json.JSONDecodeError, TypeError):
-            continue
-    records.sort(key=lambda r: (r.get("created_at") or "", str(r.get("id") or "")))
+    """Load records from the cleaned table, grouped by repo and sorted by (created_at, id)."""
     by_repo: dict[str, List[dict]] = defaultdict(list)
-    for rec in records:
-        by_repo[_repo_from_record(rec)].append(rec)
+    with closing(sqlite3.connect(str(db_path))) as conn:
+        # Read-only full scan: let SQLite memory-map the file and keep a large page cache.
+        conn.execute("PRAGMA query_only=ON")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=30000000000")
+        conn.execute("PRAGMA cache_size=-200000")
+        # repo/created_at/event_type/author_association are materialized by preprocess.py
+        # (by the workflow's slim_output step), so the raw event_data is never read.
+        cursor = conn.execute(
+            """SELECT id, cleaned_text, tokens, repo, created_at, event_type, author_association
+               FROM cleaned"""
+        )
+        # Parse and group chunk by chunk off the cursor; never materialize the full row list.
+        while rows := cursor.fetchmany(10000):
+            for _id, cleaned_text, tokens_str, repo, created_at, event_type, author_association in rows:
+                try:
+                    tokens = _json.loads(tokens_str) if tokens_str else []
+                except (_json.JSONDecodeError, TypeError):
+                    continue
+                repo = repo or ""
+                rec = {
+                    "id": _id,
+                    "cleaned_text": cleaned_text or "",
+                    "repo": repo,
+                    "created_at": created_at or "",
+                    "type": event_type or "",
+                    "author_association": author_association or "",
+                    "tokens": tokens,
+                }
+                by_repo[repo].append(rec)
+    for records in by_repo.values():
+        records.sort(key=_record_sort_key)
     return dict(by_repo)
 
 
@@ -61,44 +69,57 @@ def date_from_created_at(created_at: str) -> str:
     return (created_at or "")[:10] if created_at else ""
 
 
+_RECORD_MD = (
+    "### {number}.\n"
+    "\n"
+    "- **id:** {id}\n"
+    "- **repo:** {repo}\n"
+    "- **created_at:** {created_at}\n"
+    "- **type:** {type}\n"
+    "- **author_association:** {author_association}\n"
+    "- **tokens:** {tokens}\n"
+    "\n"
+    "**cleaned_text:**\n"
+    "{cleaned_text}\n"
+    "\n"
+    "---\n"
+)
+
+
 def record_to_md(rec: dict, number: int) -> str:
     """Format one record as Markdown: number, metadata block, cleaned_text, tokens."""
-    lines = [
-        f"### {number}.",
-        "",
-        f"- **id:** {rec.get('id', '')}",
-        f"- **repo:** {rec.get('repo', '')}",
-        f"- **created_at:** {rec.get('created_at', '')}",
-        f"- **type:** {rec.get('type', '')}",
-        f"- **author_association:** {rec.get('author_association', '')}",
-        f"- **tokens:** {rec.get('tokens', [])}",
-        "",
-        "**cleaned_text:**",
-        rec.get("cleaned_text") or "(empty)",
-        "",
-        "---",
-        "",
-    ]
-    return "\n".join(lines)
-
-
-def records_to_md(records: List[dict], repo_label: str) -> str:
-    """Group records by date, build one Markdown document with outline by date."""
-    by_date: dict[str, list[dict]] = defaultdict(list)
-    for rec in records:
-        d = date_from_created_at(rec.get("created_at") or "")
-        if d:
-            by_date[d].append(rec)
-
-    parts = [
-        f"# Repo: {repo_label}\n",
-        f"**Total:** {len(records)}\n",
-    ]
-    for date in sorted(by_date.keys()):
-        parts.append(f"## {date}\n")
-        for i, rec in enumerate(by_date[date], start=1):
-            parts.append(record_to_md(rec, i))
-    return "\n".join(parts).strip()
+    return _RECORD_MD.format(
+        number=number,
+        id=rec.get("id", ""),
+        repo=rec.get("repo", ""),
+        created_at=rec.get("created_at", ""),
+        type=rec.get("type", ""),
+        author_association=rec.get("author_association", ""),
+        tokens=rec.get("tokens", []),
+        cleaned_text=rec.get("cleaned_text") or "(empty)",
+    )
+
+
+def _record_date(rec: dict) -> str:
+    return date_from_created_at(rec.get("created_at") or "")
+
+
+def write_records_md(records: List[dict], repo_label: str, out_path: Path) -> None:
+    """
+    Stream one Markdown document, outlined by date, to out_path.
+    records must be sorted by created_at (as load_records_by_repo returns them) so each date is one contiguous run.
+    """
+    # Written fragment by fragment through a 1 MiB buffer so the document is never held in memory.
+    with open(out_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write(f"# Repo: {repo_label}\n\n")
+        f.write(f"**Total:** {len(records)}\n")
+        for date, group in groupby(records, key=_record_date):
+            if not date:
+                continue
+            f.write(f"\n## {date}\n")
+            for i, rec in enumerate(group, start=1):
+                f.write("\n")
+                f.write(record_to_md(rec, i))
 
 
 def main() -> None:
@@ -118,10 +139,8 @@ def main() -> None:
     for repo, records in sorted(by_repo.items()):
         if not records:
             continue
-        md_content = records_to_md(records, repo)
-        safe_name = repo.replace("/", "_")
-        out_path = data_dir / f"{safe_name}.md"
-        out_path.write_text(md_content, encoding="utf-8")
+        out_path = data_dir / f"{repo.translate(_SAFE_REPO)}.md"
+        write_records_md(records, repo, out_path)
         print(f"Wrote {out_path.name} ({len(records)} comments)")
 
 
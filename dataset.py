@@ -5,9 +5,11 @@ Repositories match CONFORMITY.md "Repositories Under Investigation".
 """
 import argparse
 import logging
+import signal
+import sys
 
 import project_config  # noqa: F401 — load `.env` from repo root (shared with judge / config)
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 
 from dataset_readers.gharchive.config import REPOSITORIES, DEFAULT_EVENT_TYPES
 from dataset_readers import (
@@ -48,21 +50,44 @@ def parse_args() -> argparse.Namespace:
         default="2024-02-01",
         help="Inclusive end date (YYYY-MM-DD). All 24 hours of this day are fetched.",
     )
+    parser.add_argument(
+        "--fetch-workers",
+        type=int,
+        default=8,
+        help="Hourly files downloaded concurrently (gharchive only; default: 8, 1 = sequential)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Keep downloaded hourly .json.gz files here and reuse them on later runs (gharchive only)",
+    )
     return parser.parse_args()
 
 
+def _parse_day(value: str) -> datetime:
+    """YYYY-MM-DD -> midnight datetime (date.fromisoformat; no strptime format parsing)."""
+    return datetime.combine(date.fromisoformat(value), time())
+
+
+def _exit_on_sigterm(signum: int, frame: object) -> None:
+    # Raise SystemExit so extraction unwinds normally and commits buffered events (plain SIGTERM would not).
+    sys.exit(128 + signum)
+
+
 def main() -> int:
     args = parse_args()
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
 
     repositories = REPOSITORIES
-    start_date = datetime.strptime(args.start_date, "%Y-%m-%d")
-    end_date = datetime.strptime(args.end_date, "%Y-%m-%d") + timedelta(days=1)  # inclusive → exclusive for internal range
+    start_date = _parse_day(args.start_date)
+    end_date = _parse_day(args.end_date) + timedelta(days=1)  # inclusive → exclusive for internal range
     event_types = DEFAULT_EVENT_TYPES
 
     logger.info("=" * 60)
     logger.info("GitHub Pull Request - Data Extraction")
     logger.info("=" * 60)
-    logger.info(f"Dataset reader: {args.dataset_reader}")
+    logger.info("Dataset reader: %s", args.dataset_reader)
     logger.info("Repositories: %d — %s", len(repositories), ", ".join(r.full_name for r in repositories))
     logger.info("Date range: %s to %s (inclusive)", start_date.date(), (end_date - timedelta(days=1)).date())
     logger.info("Event types: %s", ", ".join(event_types))
@@ -75,10 +100,15 @@ def main() -> int:
             start_date=start_date,
             end_date=end_date,
             event_types=event_types,
+            cache_dir=args.cache_dir,
+            fetch_workers=args.fetch_workers,
         )
     except KeyError as e:
         logger.error(str(e))
         return 1
+    except ValueError as e:
+        logger.error("Invalid extraction config: %s", e)
+        return 1
     except TypeError as e:
         logger.error("Reader does not support repositories= (e.g. bigquery): %s", e)
         return 1
@@ -3,6 +3,7 @@ Shared configuration for dataset readers.
 RepositoryConfig is used by all readers (gharchive, bigquery, etc.).
 """
 from dataclasses import dataclass
+from functools import cached_property
 
 
 @dataclass
@@ -11,7 +12,7 @@ class RepositoryConfig:
     owner: str
     name: str
 
-    @property
+    @cached_property
     def full_name(self) -> str:
-        """Returns the full repository name in owner/repo format."""
+        """Returns the full repository name in owner/repo format (computed once per instance)."""
         return f"{self.owner}/{self.name}"
@@ -2,31 +2,74 @@
 Client for GHArchive (data.gharchive.org).
 Fetches hourly JSON.gz files.
 """
-import gzip
-import json
+import io
+import os
+import re
+import shutil
+import tempfile
+import zlib
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from urllib3.util.retry import Retry
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Iterator, List, Dict, Any, Optional, Set
-from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import AbstractSet, BinaryIO, Callable, Deque, FrozenSet, Iterator, List, Dict, Any, Optional, Protocol, Tuple
 import logging
 
+try:
+    import orjson as _json  # optional C parser; accepts the raw bytes lines from GzipFile
+except ImportError:
+    import json as _json
+
+try:
+    from isal import igzip as _gzip  # optional ISA-L inflate, same GzipFile API as stdlib gzip
+    from isal.isal_zlib import error as _inflate_error
+except ImportError:
+    import gzip as _gzip
+    from zlib import error as _inflate_error
+
 logger = logging.getLogger(__name__)
 
+_HOUR = timedelta(hours=1)
+_READ_BUFFER = 1 << 20  # bytes pulled from the socket / cache file per read
+# Failures that make one hour's archive unreadable: a connection reset or read timeout mid-body
+# (urllib3), a truncated stream (EOFError) or a corrupt one (BadGzipFile, inflate error). Deliberately
+# not bare OSError: disk full or permission errors on --cache-dir must abort the run, not skip hours.
+_STREAM_ERRORS = (ProtocolError, ReadTimeoutError, EOFError, _gzip.BadGzipFile, zlib.error, _inflate_error)
 
-class HTTPClient(ABC):
-    """Abstract base class for HTTP clients."""
 
-    @abstractmethod
+class HTTPClient(Protocol):
+    """Structural interface for HTTP clients: anything with a requests-style get() (e.g. a test fake)."""
+
     def get(self, url: str, **kwargs) -> requests.Response:
-        pass
+        ...
 
 
 class RequestsHTTPClient(HTTPClient):
-    """Concrete implementation using requests library."""
+    """
+    Concrete implementation using requests library. One session and one keep-alive pool of pool_size
+    connections are shared by all fetch threads; size it to the worker count so no thread falls back
+    to a fresh TCP + TLS handshake per hour.
+    """
 
-    def __init__(self, timeout: int = 30):
+    def __init__(self, timeout: int = 30, pool_size: int = 10, retries: int = 3):
         self.timeout = timeout
         self.session = requests.Session()
+        # Transient server/connection errors retry on the pooled connection with backoff; a 404
+        # (hour not published yet) is returned at once and skipped by fetch_date_range.
+        retry = Retry(
+            total=retries,
+            backoff_factor=1,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def get(self, url: str, **kwargs) -> requests.Response:
         kwargs.setdefault("timeout", self.timeout)
@@ -36,95 +79,270 @@ class RequestsHTTPClient(HTTPClient):
         self.session.close()
 
 
+def _event_matcher(
+    repo_names: Optional[AbstractSet[str]],
+    event_types: Optional[AbstractSet[str]],
+) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Build the per-event repo + event type predicate once. Each filter combination gets its own
+    specialized closure, so the hot loop makes a single call with no per-event flag checks.
+    Repo names match case-insensitively, in repo_matches only; when both filters are set, the
+    (cheaper) type check runs first. Both sets are frozen and captured as closure locals, so a
+    lookup is one cell read plus a hash probe.
+    """
+    repos = frozenset(n.lower() for n in (repo_names or ()))
+    types = frozenset(event_types or ())
+
+    def repo_matches(event: Dict[str, Any]) -> bool:
+        # Direct indexing: every archive event has repo.name; a malformed one falls to the except.
+        try:
+            return event["repo"]["name"].lower() in repos
+        except (KeyError, TypeError, AttributeError):
+            return False
+
+    if repos and types:
+        def matches(event: Dict[str, Any]) -> bool:
+            return event.get("type") in types and repo_matches(event)
+    elif repos:
+        matches = repo_matches
+    elif types:
+        def matches(event: Dict[str, Any]) -> bool:
+            return event.get("type") in types
+    else:
+        def matches(event: Dict[str, Any]) -> bool:
+            return True
+    return matches
+
+
+@lru_cache(maxsize=64)
+def _day_url_prefix(base_url: str, year: int, month: int, day: int) -> str:
+    """URL up to the hour for one day; all 24 hours (and the log line per hour) share it."""
+    return f"{base_url}/{year}-{month:02d}-{day:02d}"
+
+
+def _line_prefilter(
+    repo_names: Optional[AbstractSet[str]],
+    event_types: Optional[AbstractSet[str]],
+) -> Optional[Callable[[bytes], bool]]:
+    """
+    Cheap bytes test run before JSON parsing: keep only lines with a configured "type" value and a
+    configured repo as a quoted JSON string. Nearly every line in an hour is some other repo (and most are
+    other event types), so this skips the parse for almost all of them. It is a superset check;
+    _event_matcher still decides on the parsed event. The types are one compiled alternation anchored on
+    the literal "type": key (a single C scan, no lowercased copy), so they are checked first; repos match
+    case-insensitively.
+    """
+    repo_needles = tuple(f'"{n.lower()}"'.encode() for n in (repo_names or ()))
+    type_search = None
+    if event_types:
+        alternation = b"|".join(re.escape(t.encode()) for t in sorted(event_types))
+        type_search = re.compile(rb'"type":\s*"(?:' + alternation + rb')"').search
+
+    if repo_needles and type_search:
+        def keep(line: bytes) -> bool:
+            if type_search(line) is None:
+                return False
+            low = line.lower()
+            return any(n in low for n in repo_needles)
+    elif repo_needles:
+        def keep(line: bytes) -> bool:
+            low = line.lower()
+            return any(n in low for n in repo_needles)
+    elif type_search:
+        def keep(line: bytes) -> bool:
+            return type_search(line) is not None
+    else:
+        return None
+    return keep
+
+
+@lru_cache(maxsize=8)
+def _compile_filters(
+    repo_names: FrozenSet[str],
+    event_types: FrozenSet[str],
+) -> Tuple[Optional[Callable[[bytes], bool]], Callable[[Dict[str, Any]], bool]]:
+    """(line prefilter, event matcher) for one filter configuration, built once and reused for every hour."""
+    return _line_prefilter(repo_names, event_types), _event_matcher(repo_names, event_types)
+
+
 class GHArchiveClient:
     """Client for fetching data from GHArchive."""
 
     BASE_URL = "https://data.gharchive.org"
 
-    def __init__(self, http_client: HTTPClient):
+    def __init__(self, http_client: HTTPClient, cache_dir: Optional[Path] = None):
         self.http_client = http_client
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
 
     def _construct_url(self, date: datetime, hour: int) -> str:
-        return f"{self.BASE_URL}/{date.year}-{date.month:02d}-{date.day:02d}-{hour}.json.gz"
+        return f"{_day_url_prefix(self.BASE_URL, date.year, date.month, date.day)}-{hour}.json.gz"
 
-    def fetch_hour_data(
+    def _open_hour(self, url: str, date: datetime, hour: int) -> BinaryIO:
+        """
+        Raw gzip stream for one hour. Without a cache_dir this is the HTTP body. With one, the file is
+        downloaded once (temp file + atomic rename, so a killed run never leaves a truncated archive)
+        and read from disk on every later run; archive hours are immutable.
+        """
+        if self.cache_dir is None:
+            response = self.http_client.get(url, stream=True)
+            response.raise_for_status()
+            return response.raw
+
+        path = self._cache_path(date, hour)
+        try:
+            f = open(path, "rb", buffering=0)  # iter_hour_events adds the (larger) read buffer
+        except FileNotFoundError:
+            self._download_to_cache(url, path)
+            f = open(path, "rb", buffering=0)
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return f
+
+    def _cache_path(self, date: datetime, hour: int) -> Path:
+        return self.cache_dir / f"{date:%Y-%m-%d}-{hour}.json.gz"
+
+    def _download_to_cache(self, url: str, path: Path) -> None:
+        """Store one hour's archive at path via a temp file + atomic rename."""
+        response = self.http_client.get(url, stream=True)
+        response.raise_for_status()
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=path.name, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                shutil.copyfileobj(response.raw, out, 1 << 20)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def iter_hour_events(
         self,
         date: datetime,
         hour: int,
-        repo_names: Optional[Set[str]] = None,
-        event_types: Optional[Set[str]] = None,
-    ) -> List[Dict[str, Any]]:
+        repo_names: Optional[AbstractSet[str]] = None,
+        event_types: Optional[AbstractSet[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Fetch one hour of events. If repo_names/event_types are set, only return events that match both.
+        Stream one hour of events, yielding each match as its line is decompressed and parsed, so the
+        hour is never buffered. If repo_names/event_types are set, only yield events that match both.
         """
         url = self._construct_url(date, hour)
+        prefilter, matches = _compile_filters(frozenset(repo_names or ()), frozenset(event_types or ()))
 
         try:
-            response = self.http_client.get(url, stream=True)
-            response.raise_for_status()
-
-            events = []
-            repo_names_lower = {n.lower() for n in (repo_names or set())}
-            event_types_set = event_types or set()
-            filter_repo = bool(repo_names_lower)
-            filter_type = bool(event_types_set)
-
-            with gzip.GzipFile(fileobj=response.raw) as f:
+            with (
+                self._open_hour(url, date, hour) as raw,
+                _gzip.GzipFile(fileobj=io.BufferedReader(raw, buffer_size=_READ_BUFFER)) as f,
+            ):
                 for line in f:
-                    if not line.strip():
+                    if len(line) <= 1:  # blank line (just b"\n"); a length check, unlike strip(), copies nothing
+                        continue
+                    if prefilter is not None and not prefilter(line):
                         continue
                     try:
-                        event = json.loads(line)
-                    except json.JSONDecodeError as e:
+                        event = _json.loads(line)
+                    except _json.JSONDecodeError as e:
                         logger.warning("Failed to parse JSON line: %s", e)
                         continue
-                    if filter_repo:
-                        repo_name = (event.get("repo") or {}).get("name") or ""
-                        if repo_name.lower() not in repo_names_lower:
-                            continue
-                    if filter_type and event.get("type") not in event_types_set:
-                        continue
-                    events.append(event)
-
-            logger.info("Fetched %s events from %s", len(events), url)
-            return events
+                    if matches(event):
+                        yield event
 
         except requests.RequestException as e:
             logger.error("Failed to fetch data from %s: %s", url, e)
             raise
+        except _STREAM_ERRORS as e:
+            logger.error("Failed to read data from %s: %s", url, e)
+            if self.cache_dir is not None:
+                # A cached archive that fails to decompress is corrupt; drop it so the next run re-downloads.
+                self._cache_path(date, hour).unlink(missing_ok=True)
+            raise
+
+    def fetch_hour_data(
+        self,
+        date: datetime,
+        hour: int,
+        repo_names: Optional[AbstractSet[str]] = None,
+        event_types: Optional[AbstractSet[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch one hour of matching events as a list. fetch_date_range uses this so an hour that fails
+        mid-download is skipped whole instead of half-written to the DB.
+        """
+        events = list(self.iter_hour_events(date, hour, repo_names=repo_names, event_types=event_types))
+        logger.info("Fetched %s events from %s", len(events), self._construct_url(date, hour))
+        return events
+
+    def _fetch_hour_or_skip(
+        self,
+        date: datetime,
+        hour: int,
+        repo_names: Optional[AbstractSet[str]],
+        event_types: Optional[AbstractSet[str]],
+    ) -> List[Dict[str, Any]]:
+        """
+        fetch_hour_data, but a failed hour (HTTP error, broken or corrupt archive) is logged and returned as
+        empty so the range keeps going. Local I/O errors, e.g. a full --cache-dir, propagate and abort the run.
+        """
+        try:
+            return self.fetch_hour_data(date, hour, repo_names=repo_names, event_types=event_types)
+        except (requests.RequestException, *_STREAM_ERRORS) as e:
+            logger.warning("Skipping %s hour %s due to fetch error: %s", date.date(), hour, e)
+            return []
 
     def fetch_date_range(
         self,
         start_date: datetime,
         end_date: datetime,
-        repo_names: Optional[Set[str]] = None,
-        event_types: Optional[Set[str]] = None,
+        repo_names: Optional[AbstractSet[str]] = None,
+        event_types: Optional[AbstractSet[str]] = None,
+        workers: int = 1,
     ) -> Iterator[List[Dict[str, Any]]]:
         """Yield hourly event lists for [start_date, end_date). end_date is exclusive internally;
-        dataset.py adds one day when parsing --end-date so the CLI flag is inclusive."""
-        current_date = start_date
-
-        while current_date < end_date:
-            for hour in range(24):
-                current_datetime = current_date.replace(hour=hour)
-                if current_datetime >= end_date:
-                    return
-
-                try:
-                    events = self.fetch_hour_data(
-                        current_date,
-                        hour,
-                        repo_names=repo_names,
-                        event_types=event_types,
-                    )
+        dataset.py adds one day when parsing --end-date so the CLI flag is inclusive.
+        With workers > 1, up to that many hours download concurrently (extraction is network-bound);
+        hours are still yielded in chronological order."""
+        def fetch(date_hour: Tuple[datetime, int]) -> List[Dict[str, Any]]:
+            return self._fetch_hour_or_skip(*date_hour, repo_names, event_types)
+
+        hours = _hours_in_range(start_date, end_date)
+        if workers <= 1:
+            for events in map(fetch, hours):
+                if events:
+                    yield events
+            return
+
+        # At most 2 * workers hours are in flight or finished-but-unconsumed, so a slow writer
+        # cannot let completed hours pile up in memory over a long range.
+        executor = ThreadPoolExecutor(max_workers=workers)
+        pending: Deque[Future] = deque()
+        try:
+            for date_hour in hours:
+                pending.append(executor.submit(fetch, date_hour))
+                if len(pending) >= 2 * workers:
+                    events = pending.popleft().result()
                     if events:
                         yield events
-                except requests.RequestException:
-                    logger.warning(
-                        "Skipping %s hour %s due to fetch error",
-                        current_date.date(),
-                        hour,
-                    )
-                    continue
-
-            current_date += timedelta(days=1)
+            while pending:
+                events = pending.popleft().result()
+                if events:
+                    yield events
+        finally:
+            # Stop queued hours from downloading if the consumer bails out early.
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _hours_in_range(start_date: datetime, end_date: datetime) -> Iterator[Tuple[datetime, int]]:
+    """
+    (day, hour) pairs for every GHArchive hour file in [start_date, end_date). Walks integer hour
+    offsets from the epoch and builds one day datetime per 24 hours instead of one per hour.
+    """
+    epoch = start_date.replace(year=1970, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    first = (start_date - epoch) // _HOUR
+    last = -((epoch - end_date) // _HOUR)  # ceil: a partial final hour still has a file
+    day_offset, day = None, None
+    for h in range(first, last):
+        d, hour = divmod(h, 24)
+        if d != day_offset:
+            day_offset, day = d, epoch + timedelta(days=d)
+        yield day, hour
@@ -3,7 +3,7 @@ Configuration for GHArchive data extraction.
 Repositories match CONFORMITY.md "Repositories Under Investigation".
 """
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from dataset_readers.config import RepositoryConfig
@@ -17,6 +17,8 @@ class ExtractionConfig:
     end_date: datetime
     event_types: List[str]
     output_dir: str = "./data/raw"
+    fetch_workers: int = 8  # concurrent hour downloads; 1 = sequential
+    cache_dir: Optional[str] = None  # keep downloaded .json.gz hours here and reuse them across runs
 
     def __post_init__(self):
         if self.start_date >= self.end_date:
@@ -25,6 +27,8 @@ class ExtractionConfig:
             raise ValueError("repositories cannot be empty")
         if not self.event_types:
             raise ValueError("event_types cannot be empty")
+        if self.fetch_workers < 1:
+            raise ValueError("fetch_workers must be at least 1")
 
 
 # Repositories under investigation (CONFORMITY.md). Use exact owner/repo for GHArchive filter.
@@ -5,7 +5,7 @@ Fetches each hour once; client filters by repo and event type. Matching events g
 """
 import logging
 from pathlib import Path
-from typing import List, Tuple
+from typing import FrozenSet, List, Tuple
 
 from dataset_readers.gharchive.config import ExtractionConfig
 from dataset_readers.gharchive.client import GHArchiveClient, RequestsHTTPClient
@@ -19,10 +19,13 @@ class DataExtractor:
 
     def __init__(self, config: ExtractionConfig):
         self.config = config
-        http_client = RequestsHTTPClient(timeout=60)
-        self.client = GHArchiveClient(http_client)
+        http_client = RequestsHTTPClient(timeout=60, pool_size=config.fetch_workers)
+        self.client = GHArchiveClient(http_client, cache_dir=config.cache_dir)
         storage = SQLiteStorage(config.output_dir)
         self.repository = DataRepository(storage)
+        # Fixed for the whole run; the client compiles its line/event filters once per distinct pair.
+        self._repo_names: FrozenSet[str] = frozenset(r.full_name for r in config.repositories)
+        self._event_types: FrozenSet[str] = frozenset(config.event_types)
 
     def extract(self) -> List[Tuple[str, str]]:
         """
@@ -41,14 +44,24 @@ class DataExtractor:
         logger.info("Event types: %s", ", ".join(self.config.event_types))
 
         try:
-            for hourly_events in self.client.fetch_date_range(
-                self.config.start_date,
-                self.config.end_date,
-                repo_names=set(repo_names),
-                event_types=set(self.config.event_types),
-            ):
-                writer.append_events(hourly_events)
-                logger.info("Events this hour: %d", len(hourly_events))
+            try:
+                for hourly_events in self.client.fetch_date_range(
+                    self.config.start_date,
+                    self.config.end_date,
+                    repo_names=self._repo_names,
+                    event_types=self._event_types,
+                    workers=self.config.fetch_workers,
+                ):
+                    writer.append_events(hourly_events)
+                    logger.info("Events this hour: %d", len(hourly_events))
+            except BaseException:
+                # The writer buffers up to FLUSH_BYTES across hours: commit what was already fetched
+                # (and logged) so a failed or interrupted run can be resumed without losing it.
+                try:
+                    writer.finalize()
+                except Exception as flush_error:
+                    logger.error("Could not save buffered events: %s", flush_error)
+                raise
 
             db_path_str = writer.finalize(
                 additional_metadata={
@@ -3,10 +3,17 @@ Data models for GHArchive events.
 """
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from enum import Enum
 
 
+@lru_cache(maxsize=4096)
+def _parse_ts(value: str) -> datetime:
+    """GitHub ISO 8601 timestamp ("...Z") to an aware datetime. Cached: many events share a timestamp."""
+    return datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+
+
 class EventType(Enum):
     """GitHub event types for PR comment analysis."""
     PULL_REQUEST = "PullRequestEvent"
@@ -15,7 +22,7 @@ class EventType(Enum):
     ISSUE_COMMENT = "IssueCommentEvent"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Actor:
     """GitHub user/actor."""
     id: int
@@ -31,7 +38,7 @@ class Actor:
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PullRequest:
     """Pull request metadata."""
     id: int
@@ -50,16 +57,12 @@ class PullRequest:
             title=data.get("title", ""),
             body=data.get("body"),
             state=data.get("state", ""),
-            created_at=datetime.fromisoformat(
-                data["created_at"].replace("Z", "+00:00")
-            ),
-            updated_at=datetime.fromisoformat(
-                data["updated_at"].replace("Z", "+00:00")
-            ),
+            created_at=_parse_ts(data["created_at"]),
+            updated_at=_parse_ts(data["updated_at"]),
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Comment:
     """Comment on a PR or issue."""
     id: int
@@ -73,17 +76,13 @@ class Comment:
         return cls(
             id=data.get("id"),
             body=data.get("body", ""),
-            created_at=datetime.fromisoformat(
-                data["created_at"].replace("Z", "+00:00")
-            ),
-            updated_at=datetime.fromisoformat(
-                data["updated_at"].replace("Z", "+00:00")
-            ),
+            created_at=_parse_ts(data["created_at"]),
+            updated_at=_parse_ts(data["updated_at"]),
             user=Actor.from_dict(data.get("user", {})),
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class GitHubEvent:
     """GitHub event from GHArchive JSON."""
 
@@ -99,9 +98,7 @@ class GitHubEvent:
         return cls(
             event_id=data.get("id"),
             event_type=EventType(data.get("type")),
-            created_at=datetime.fromisoformat(
-                data["created_at"].replace("Z", "+00:00")
-            ),
+            created_at=_parse_ts(data["created_at"]),
             actor=Actor.from_dict(data.get("actor", {})),
             repo_name=data.get("repo", {}).get("name", ""),
             payload=data.get("payload", {}),
@@ -109,21 +106,42 @@ class GitHubEvent:
 
     def extract_text_content(self) -> Optional[str]:
         """Extract text suitable for analysis (e.g. judge, preprocessing)."""
-        if self.event_type == EventType.PULL_REQUEST:
-            pr_data = self.payload.get("pull_request", {})
-            title = pr_data.get("title", "")
-            body = pr_data.get("body", "")
-            return f"{title}\n{body}" if body else title
-
-        elif self.event_type in [
-            EventType.PR_REVIEW_COMMENT,
-            EventType.ISSUE_COMMENT,
-        ]:
-            comment = self.payload.get("comment", {})
-            return comment.get("body", "")
-
-        elif self.event_type == EventType.PR_REVIEW:
-            review = self.payload.get("review", {})
-            return review.get("body", "")
-
-        return None
+        return _text_from_payload(self.event_type.value, self.payload)
+
+
+def text_content_from_dict(data: Dict[str, Any]) -> Optional[str]:
+    """
+    Same text as GitHubEvent.from_dict(data).extract_text_content(), read straight from the raw
+    event dict. Skips building the model (timestamp parsing, Actor) when only the text is needed.
+    """
+    return _text_from_payload(data.get("type"), data.get("payload") or {})
+
+
+def _pr_text(payload: Dict[str, Any]) -> str:
+    pr_data = payload.get("pull_request", {})
+    title = pr_data.get("title", "")
+    body = pr_data.get("body", "")
+    return f"{title}\n{body}" if body else title
+
+
+def _comment_text(payload: Dict[str, Any]) -> str:
+    return payload.get("comment", {}).get("body", "")
+
+
+def _review_text(payload: Dict[str, Any]) -> str:
+    return payload.get("review", {}).get("body", "")
+
+
+# Event type string -> text extractor; one dict lookup instead of an if/elif chain per event.
+_TEXT_EXTRACTORS = {
+    EventType.PULL_REQUEST.value: _pr_text,
+    EventType.PR_REVIEW_COMMENT.value: _comment_text,
+    EventType.ISSUE_COMMENT.value: _comment_text,
+    EventType.PR_REVIEW.value: _review_text,
+}
+
+
+def _text_from_payload(event_type: Optional[str], payload: Dict[str, Any]) -> Optional[str]:
+    """PR title + body, comment body, or review body depending on event type; None for other types."""
+    extract = _TEXT_EXTRACTORS.get(event_type)
+    return extract(payload) if extract is not None else None
@@ -3,7 +3,7 @@ GHArchive dataset reader. Wraps DataExtractor for the dataset_readers plugin int
 Fetches each hour once; one SQLite DB for all configured repos.
 """
 from datetime import datetime
-from typing import Any, List, Tuple
+from typing import Any, List, Optional, Tuple
 
 from dataset_readers.base import DatasetReaderBase
 from dataset_readers.config import RepositoryConfig
@@ -29,6 +29,8 @@ class GHArchiveReader(DatasetReaderBase):
         start_date: datetime,
         end_date: datetime,
         event_types: List[str] = None,
+        cache_dir: Optional[str] = None,
+        fetch_workers: int = 8,
         **kwargs: Any,
     ):
         if event_types is None:
@@ -39,6 +41,8 @@ class GHArchiveReader(DatasetReaderBase):
             end_date=end_date,
             event_types=event_types,
             output_dir=str(DATA_DIR),
+            cache_dir=cache_dir,
+            fetch_workers=fetch_workers,
         )
         self._extractor = DataExtractor(config)
 
@@ -1,7 +1,7 @@
 """
 Storage layer for extracted GHArchive events using a single SQLite database.
-One DB file per output dir (default: data/raw/events.db). Uses INSERT OR REPLACE
-for resumable extraction (dedupe by event id).
+One DB file per output dir (default: data/raw/events.db). Uses INSERT OR IGNORE
+for resumable extraction (dedupe by event id; archive events never change).
 
 Tables
 ------
@@ -17,13 +17,40 @@ cleaned
 import json
 import sqlite3
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Iterable, Dict, Any, Optional
 import logging
 
+try:
+    import orjson
+
+    def _dumps_event(event: Dict[str, Any]) -> str:
+        """Compact UTF-8 JSON for event_data (orjson; decoded so the column stays TEXT for json_extract)."""
+        return orjson.dumps(event).decode()
+except ImportError:
+    def _dumps_event(event: Dict[str, Any]) -> str:
+        """Compact UTF-8 JSON for event_data."""
+        return json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_DB_FILENAME = "events.db"
 
+# StreamingWriter buffers serialized events and commits once this much JSON is pending.
+FLUSH_BYTES = 1 << 20
+
+# Bulk-append settings for the extraction connection. WAL + synchronous=NORMAL syncs at checkpoints
+# instead of on every commit and stays crash-safe; at worst the last commits are lost, and the next
+# (resumable) run fetches them again. 256 MiB page cache, 256 MiB mmap.
+WRITER_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-262144;
+PRAGMA mmap_size=268435456;
+"""
+
+INSERT_EVENT_SQL = "INSERT OR IGNORE INTO events (id, event_data) VALUES (?, ?)"
+
 # Single schema: id + JSON blob. Used for both events and cleaned tables.
 EVENTS_TABLE_COLUMNS = [
     "id TEXT PRIMARY KEY",
@@ -37,36 +64,31 @@ def _create_events_table(conn: sqlite3.Connection) -> None:
     )
 
 
-def _repo_from_event_data(event_data: str) -> str:
-    """Extract repo name from event_data JSON (raw: $.repo.name, cleaned: $.repo)."""
-    try:
-        obj = json.loads(event_data)
-        repo = obj.get("repo")
-        if isinstance(repo, str):
-            return repo
-        return (repo or {}).get("name") or ""
-    except (json.JSONDecodeError, TypeError):
-        return ""
-
-
 def get_raw_db_stats(db_path: Path) -> Dict[str, Any]:
     """Return size and row counts for the raw events DB (for logging after extraction)."""
-    if not db_path.exists():
+    try:
+        size_bytes = db_path.stat().st_size  # one stat; also the existence check (connect() would create it)
+    except FileNotFoundError:
         return {"path": str(db_path), "size_bytes": 0, "total_rows": 0, "by_repo": {}}
-    size_bytes = db_path.stat().st_size
     conn = sqlite3.connect(str(db_path))
-    (total_rows,) = conn.execute("SELECT COUNT(*) FROM events").fetchone()
-    cursor = conn.execute("SELECT event_data FROM events")
-    by_repo: Dict[str, int] = {}
-    for (blob,) in cursor:
-        repo = _repo_from_event_data(blob) or "(no repo)"
-        by_repo[repo] = by_repo.get(repo, 0) + 1
-    conn.close()
-    by_repo = dict(sorted(by_repo.items()))
+    try:
+        # Bucket by $.repo.name inside SQLite (C JSON parser + GROUP BY), not row by row in Python.
+        # json_valid guards against a malformed row aborting the whole query.
+        by_repo: Dict[str, int] = dict(
+            conn.execute(
+                """SELECT COALESCE(NULLIF(CASE WHEN json_valid(event_data)
+                                               THEN json_extract(event_data, '$.repo.name') END, ''),
+                                   '(no repo)') AS repo,
+                          COUNT(*)
+                   FROM events GROUP BY repo ORDER BY repo"""
+            )
+        )
+    finally:
+        conn.close()
     return {
         "path": str(db_path),
         "size_bytes": size_bytes,
-        "total_rows": total_rows,
+        "total_rows": sum(by_repo.values()),  # every row lands in exactly one bucket; no second scan
         "by_repo": by_repo,
     }
 
@@ -84,55 +106,103 @@ CREATE TABLE IF NOT EXISTS cleaned (
 )
 """
 
+# Per-repo and repo + time-range queries (GROUP BY repo, WHERE repo = ? AND created_at BETWEEN ...)
+# are answered from this index without touching the wide cleaned_text/tokens rows.
+# Built after the bulk load (one sort) rather than maintained row by row during it.
+CLEANED_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_cleaned_repo_time_type ON cleaned (repo, created_at, event_type)"
+)
+
 
 def _create_cleaned_table(conn: sqlite3.Connection) -> None:
     conn.executescript(CLEANED_TABLE_SCHEMA.strip())
 
 
+def _create_cleaned_indexes(conn: sqlite3.Connection) -> None:
+    conn.execute(CLEANED_INDEX_SQL)
+
+
 class StreamingWriter:
     """
     Writes events to a single SQLite database. All repos append to the same DB.
-    Uses INSERT OR REPLACE for resumable extraction (dedupe by event id).
-    Call append_events() per batch, then finalize() once when done.
+    Uses INSERT OR IGNORE for resumable extraction (dedupe by event id), so total_changes counts
+    exactly the new rows and no COUNT(*) scan is needed per batch.
+    Call append_events() per batch, then finalize() once when done. Events are buffered and written
+    in one transaction per ~FLUSH_BYTES of JSON, so sparse hours do not each pay for a commit.
     """
 
     def __init__(self, db_path: Path):
         self._path = db_path
         self._path.parent.mkdir(parents=True, exist_ok=True)
-        self._conn = sqlite3.connect(str(self._path))
+        # Autocommit mode: _flush() opens and commits its own explicit transaction.
+        self._conn = sqlite3.connect(str(self._path), isolation_level=None)
+        self._conn.executescript(WRITER_PRAGMAS)
         _create_events_table(self._conn)
         (self._initial_count,) = self._conn.execute("SELECT COUNT(*) FROM events").fetchone()
-        self._count = 0  # net new rows this run (updated after each batch)
-
-    def append_events(self, events: List[Dict[str, Any]]) -> None:
-        """Insert or replace events by id (resumable extraction). Stores full event as JSON."""
-        (total_before,) = self._conn.execute("SELECT COUNT(*) FROM events").fetchone()
+        (self._page_size,) = self._conn.execute("PRAGMA page_size").fetchone()
+        self._cur = self._conn.cursor()  # reused for every flush; INSERT_EVENT_SQL stays prepared in it
+        self._count = 0  # net new rows this run (updated after each flush)
+        self._pending: Dict[str, str] = {}  # id -> event JSON, one entry per id until the next flush
+        self._pending_bytes = 0
+
+    def append_events(self, events: Iterable[Dict[str, Any]]) -> None:
+        """
+        Queue events for insert by id (resumable extraction). Stores full event as JSON.
+        Accepts any iterable (e.g. GHArchiveClient.iter_hour_events) and consumes it one event at a time.
+        """
+        pending = self._pending
         for event in events:
             eid = str(event.get("id", ""))
-            if not eid:
+            # First occurrence wins, as with INSERT OR IGNORE; a repeat is never serialized or sent.
+            if not eid or eid in pending:
                 continue
-            event_json = json.dumps(event, ensure_ascii=False)
-            self._conn.execute(
-                "INSERT OR REPLACE INTO events (id, event_data) VALUES (?, ?)",
-                (eid, event_json),
+            event_json = _dumps_event(event)
+            pending[eid] = event_json
+            self._pending_bytes += len(event_json)
+        if self._pending_bytes >= FLUSH_BYTES:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Write all pending events in one transaction."""
+        if not self._pending:
+            return
+        changes_before = self._conn.total_changes
+        cur = self._cur
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            # Key order: consecutive inserts land on the same or adjacent primary-key B-tree pages.
+            cur.executemany(INSERT_EVENT_SQL, sorted(self._pending.items()))
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+        self._pending.clear()
+        self._pending_bytes = 0
+        net_this_batch = self._conn.total_changes - changes_before
+        self._count += net_this_batch
+        if logger.isEnabledFor(logging.INFO):
+            # Logical DB size from the pager: no stat() syscall, and unlike the file size it includes
+            # pages still sitting in the WAL.
+            (page_count,) = cur.execute("PRAGMA page_count").fetchone()
+            size_mb = page_count * self._page_size / (1024 * 1024)
+            logger.info(
+                "DB: %.2f MiB | total rows: %d | added this batch: %d | added this run: %d",
+                size_mb,
+                self._initial_count + self._count,
+                net_this_batch,
+                self._count,
             )
-        self._conn.commit()
-        (total_after,) = self._conn.execute("SELECT COUNT(*) FROM events").fetchone()
-        net_this_batch = total_after - total_before
-        self._count = total_after - self._initial_count
-        size_bytes = self._path.stat().st_size
-        size_mb = size_bytes / (1024 * 1024)
-        logger.info(
-            "DB: %.2f MiB | total rows: %d | added this batch: %d | added this run: %d",
-            size_mb,
-            total_after,
-            net_this_batch,
-            self._count,
-        )
 
     def finalize(self, additional_metadata: Optional[Dict[str, Any]] = None) -> str:
-        """Close connection. additional_metadata is ignored (no metadata table)."""
-        self._conn.close()
+        """Write any pending events and close connection. additional_metadata is ignored (no metadata table)."""
+        try:
+            self._flush()
+            # Fold the WAL back into the main file so the DB is compact and readers start warm, and refresh
+            # planner statistics for the follow-up stats/preprocessing queries.
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("PRAGMA optimize")
+        finally:
+            self._conn.close()
         logger.info("Saved %s new records (net) to %s", self._count, self._path)
         return str(self._path)
 
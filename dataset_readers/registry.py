@@ -13,25 +13,32 @@ T = TypeVar("T", bound=DatasetReaderBase)
 _REGISTRY: Dict[str, Type[DatasetReaderBase]] = {}
 
 
+def _normalize(name: str) -> str:
+    return name.lower().strip()
+
+
 def register_reader(name: str) -> type:
-    """Decorator to register a DatasetReaderBase subclass."""
+    """Decorator to register a DatasetReaderBase subclass. The name is normalized once, here."""
+    key = _normalize(name)
+
     def decorator(cls: Type[T]) -> Type[T]:
         if not issubclass(cls, DatasetReaderBase):
             raise TypeError(f"{cls} must inherit from DatasetReaderBase")
-        if name in _REGISTRY:
-            logger.warning(f"Overwriting reader '{name}' with {cls.__name__}")
-        _REGISTRY[name.lower().strip()] = cls
+        if key in _REGISTRY:
+            logger.warning("Overwriting reader '%s' with %s", key, cls.__name__)
+        _REGISTRY[key] = cls
         return cls
     return decorator
 
 
 def get_reader(name: str, **kwargs: object) -> DatasetReaderBase:
     """Get an instance of a registered reader by name."""
-    key = name.lower().strip()
-    if key not in _REGISTRY:
+    # Keys are stored normalized, so the common already-normalized name is a single dict hit.
+    cls = _REGISTRY.get(name) or _REGISTRY.get(_normalize(name))
+    if cls is None:
         available = ", ".join(sorted(_REGISTRY.keys()))
         raise KeyError(f"Unknown dataset reader '{name}'. Available: {available}")
-    return _REGISTRY[key](**kwargs)
+    return cls(**kwargs)
 
 
 def list_readers() -> List[str]:
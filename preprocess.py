@@ -27,14 +27,23 @@ def main() -> int:
         metavar="N",
         help="Drop events with fewer than N tokens after cleaning (default: 1 — retain any non-empty text).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Worker processes for text cleaning (default: 1 = run in-process; e.g. the CPU count on a large DB).",
+    )
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
 
     data_dir = Path(DATA_DIR)
     if not data_dir.is_dir():
         logger.error("Data directory does not exist: %s (set DATA_DIR in project_config.py)", data_dir)
         return 1
 
-    pipeline = CleanerPipeline(str(data_dir), min_tokens=args.min_tokens)
+    pipeline = CleanerPipeline(str(data_dir), min_tokens=args.min_tokens, workers=args.workers)
     results = pipeline.run()
 
     if not results:
@@ -44,7 +53,7 @@ def main() -> int:
     total_read = sum(r[1] for r in results)
     total_duplicates = sum(r[2] for r in results)
     total_written = sum(r[3] for r in results)
-    logger.info("Total: read %s, duplicates %s, kept %s", total_read, total_duplicates, total_written)
+    logger.info("Total: read %s, duplicate ids ignored %s, kept %s", total_read, total_duplicates, total_written)
     return 0
 
 
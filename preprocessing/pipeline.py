@@ -1,90 +1,188 @@
 """
-Pipeline: read events table, run workflow per event (dedupe by id, filter, clean text, slim output), write cleaned table to same DB.
+Pipeline: read events table, run workflow per event (filter, clean text, slim output), write cleaned table to same DB (deduped by id).
 DB path from project config (preprocess.py passes DATA_DIR). See preprocessing/workflow.default_workflow() for steps.
 """
 import json
 import sqlite3
 import logging
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Deque, Dict, Iterator, List, Optional
 
 from preprocessing.workflow import Workflow, default_workflow
-from dataset_readers.gharchive.storage import DEFAULT_DB_FILENAME, _create_cleaned_table
+from dataset_readers.gharchive.storage import (
+    DEFAULT_DB_FILENAME,
+    WRITER_PRAGMAS,
+    _create_cleaned_indexes,
+    _create_cleaned_table,
+)
+
+try:
+    import orjson as _json  # optional C parser/serializer for the per-event decode and tokens encode
+
+    def _dumps_tokens(tokens: List[str]) -> str:
+        return _json.dumps(tokens).decode()
+except ImportError:
+    _json = json
+
+    def _dumps_tokens(tokens: List[str]) -> str:
+        return json.dumps(tokens, ensure_ascii=False, separators=(",", ":"))
 
 logger = logging.getLogger(__name__)
 
+READ_BATCH_ROWS = 1000  # events pulled per fetchmany call; also the unit of work handed to a worker
+INSERT_CLEANED_SQL = (
+    "INSERT OR IGNORE INTO cleaned "
+    "(id, cleaned_text, tokens, repo, pr_number, event_type, created_at, author_association) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
 
-def clean_db(workflow: Workflow, db_path: Path) -> tuple[int, int, int]:
-    """Read from db_path (events table), run workflow, write cleaned table to same DB. Returns (read_count, duplicate_count, written_count)."""
-    read_count = 0
-    duplicate_count = 0
-    written_count = 0
-    seen_ids = set()
-    db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(str(db_path))
-    conn.execute("DROP TABLE IF EXISTS cleaned")
-    _create_cleaned_table(conn)
-    cursor = conn.execute("SELECT event_data FROM events")
+def _iter_event_batches(db_path: Path) -> Iterator[List[str]]:
+    """
+    Yield lists of event_data from the events table over a separate read-only connection (fetchmany batches).
+    The DB must already be in WAL mode (clean_db's writer sets it) so this reader never blocks its commits.
+    """
+    reader = sqlite3.connect(db_path.resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        cursor = reader.execute("SELECT event_data FROM events")
+        for rows in iter(lambda: cursor.fetchmany(READ_BATCH_ROWS), []):
+            yield [event_data for (event_data,) in rows]
+    finally:
+        reader.close()
+
 
-    for row in cursor:
-        read_count += 1
+def _clean_rows(workflow: Workflow, batch: List[str], offset: int) -> List[tuple]:
+    """
+    Run workflow over one batch of event_data and return cleaned rows ready for INSERT_CLEANED_SQL.
+    offset is the number of events read before this batch (fallback id for events without one).
+    """
+    events: List[Dict[str, Any]] = []
+    keys: List[str] = []  # row id per decoded event, aligned with events
+    for i, event_data in enumerate(batch, start=offset + 1):
         try:
-            event = json.loads(row[0])
-        except (json.JSONDecodeError, TypeError):
+            event = _json.loads(event_data)
+        except (_json.JSONDecodeError, TypeError):
             continue
-
         eid = event.get("id")
         eid_key = str(eid) if eid is not None else ""
-        if eid_key and eid_key in seen_ids:
-            duplicate_count += 1
-            continue
-        if eid_key:
-            seen_ids.add(eid_key)
+        events.append(event)
+        keys.append(eid_key or str(i))
 
-        cleaned = workflow.run(event)
+    rows: List[tuple] = []
+    for eid_key, cleaned in zip(keys, workflow.run_many(events)):
         if cleaned is not None:
-            tokens_json = json.dumps(cleaned.get("tokens") or [], ensure_ascii=False)
-            conn.execute(
-                "INSERT OR REPLACE INTO cleaned "
-                "(id, cleaned_text, tokens, repo, pr_number, event_type, created_at, author_association) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    eid_key or str(read_count),
-                    cleaned.get("cleaned_text") or "",
-                    tokens_json,
-                    cleaned.get("repo") or "",
-                    cleaned.get("pr_number"),
-                    cleaned.get("event_type") or "",
-                    cleaned.get("created_at") or "",
-                    cleaned.get("author_association") or "",
-                ),
-            )
-            written_count += 1
-
-    conn.commit()
-    conn.close()
-    return read_count, duplicate_count, written_count
+            rows.append((
+                eid_key,
+                cleaned.get("cleaned_text") or "",
+                _dumps_tokens(cleaned.get("tokens") or []),
+                cleaned.get("repo") or "",
+                cleaned.get("pr_number"),
+                cleaned.get("event_type") or "",
+                cleaned.get("created_at") or "",
+                cleaned.get("author_association") or "",
+            ))
+    return rows
+
+
+_worker_workflow: Optional[Workflow] = None  # set once per worker process by _init_worker
+
+
+def _init_worker(workflow: Workflow) -> None:
+    global _worker_workflow
+    _worker_workflow = workflow
+
+
+def _clean_rows_in_worker(batch: List[str], offset: int) -> List[tuple]:
+    return _clean_rows(_worker_workflow, batch, offset)
+
+
+def _cleaned_batches(workflow: Workflow, db_path: Path, workers: int) -> Iterator[tuple[int, List[tuple]]]:
+    """Yield (events read, cleaned rows) per input batch, in input order; workers > 1 cleans batches in parallel."""
+    offset = 0
+    if workers <= 1:
+        for batch in _iter_event_batches(db_path):
+            yield len(batch), _clean_rows(workflow, batch, offset)
+            offset += len(batch)
+        return
+    # Cleaning is CPU-bound regex work: fan batches out to processes, write results here in input order.
+    # At most workers + 1 batches are in flight (one running per worker plus one queued), so the parent
+    # holds about (workers + 1) * READ_BATCH_ROWS raw event_data strings plus their pickled copies.
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(workflow,))
+    pending: Deque[tuple[int, Future]] = deque()
+    try:
+        for batch in _iter_event_batches(db_path):
+            pending.append((len(batch), executor.submit(_clean_rows_in_worker, batch, offset)))
+            offset += len(batch)
+            if len(pending) > workers:
+                n, future = pending.popleft()
+                yield n, future.result()
+        while pending:
+            n, future = pending.popleft()
+            yield n, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def clean_db(workflow: Workflow, db_path: Path, workers: int = 1) -> tuple[int, int, int]:
+    """
+    Read from db_path (events table), run workflow, write cleaned table to same DB. Returns (read_count, duplicate_count, written_count).
+    duplicate_count is the number of kept rows (those the workflow did not drop) that INSERT OR IGNORE skipped
+    because a row with the same id was already written; events the workflow drops are never checked for duplicates.
+    workers > 1 runs the workflow in that many processes (the workflow must be picklable; default_workflow() is).
+    """
+    read_count = 0
+    kept_count = 0
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Autocommit mode: all cleaned inserts go in one explicit transaction, with no implicit BEGINs from the driver.
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
+    try:
+        conn.executescript(WRITER_PRAGMAS)
+        conn.execute("DROP TABLE IF EXISTS cleaned")
+        _create_cleaned_table(conn)
+        # Dedupe by id in SQLite: INSERT OR IGNORE keeps the first row per id, so total_changes counts exactly
+        # the rows written and the remainder are kept rows ignored as duplicate ids. No Python-side set of every id seen.
+        changes_before = conn.total_changes
+        # Locking mode stays NORMAL: _iter_event_batches reads events over its own connection meanwhile.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for n_read, rows in _cleaned_batches(workflow, db_path, workers):
+                read_count += n_read
+                kept_count += len(rows)
+                if rows:
+                    conn.executemany(INSERT_CLEANED_SQL, rows)
+            _create_cleaned_indexes(conn)  # once over the loaded table, inside the same transaction
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        written_count = conn.total_changes - changes_before
+    finally:
+        conn.close()
+    return read_count, kept_count - written_count, written_count
 
 
 class CleanerPipeline:
     """Run preprocessing on the SQLite DB in data_dir (events.db); writes cleaned table to same DB."""
 
-    def __init__(self, data_dir: str, workflow: Optional[Workflow] = None, min_tokens: int = 1):
+    def __init__(self, data_dir: str, workflow: Optional[Workflow] = None, min_tokens: int = 1, workers: int = 1):
         self.data_dir = Path(data_dir)
         self.workflow = workflow if workflow is not None else default_workflow(min_tokens=min_tokens)
+        self.workers = workers
 
     def run(self) -> List[tuple[str, int, int, int]]:
-        """Read events from data_dir/events.db, run workflow, write cleaned table. Returns list of (filename, read_count, duplicate_count, written_count)."""
+        """Read events from data_dir/events.db, run workflow, write cleaned table. Returns list of (filename, read_count, duplicate_count, written_count); see clean_db for duplicate_count."""
         results = []
         db_path = self.data_dir / DEFAULT_DB_FILENAME
         if not db_path.exists():
             logger.warning("No %s found in %s", DEFAULT_DB_FILENAME, self.data_dir)
             return results
-        read_count, duplicate_count, written_count = clean_db(self.workflow, db_path)
+        read_count, duplicate_count, written_count = clean_db(self.workflow, db_path, workers=self.workers)
         results.append((DEFAULT_DB_FILENAME, read_count, duplicate_count, written_count))
         logger.info(
-            "%s: read %s, duplicates %s, kept %s",
+            "%s: read %s, duplicate ids ignored %s, kept %s",
             DEFAULT_DB_FILENAME,
             read_count,
             duplicate_count,
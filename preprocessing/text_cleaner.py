@@ -16,7 +16,8 @@ _CODE_BLOCK_RE = re.compile(r"```[\w]*\n.*?```", re.DOTALL | re.IGNORECASE)
 # Example: "+ This is a diff snippet" -> True
 # Example: "- This is a diff snippet" -> True
 # Example: " This is a diff snippet" -> False
-_DIFF_LINE_RE = re.compile(r"^[\+\-]\s?.*$", re.MULTILINE)
+# Tested with str.startswith on the left-stripped line (leading whitespace is ignored).
+_DIFF_PREFIXES = ("+", "-")
 
 # Markdown images: ![alt](url) and [image](url) (GitHub-style image links)
 # Examples
@@ -32,12 +33,16 @@ _IMAGE_LINK_RE = re.compile(r"\[image\]\([^)]*\)", re.IGNORECASE)
 # Example: "Hello, world! 123." -> ["Hello", "world", "123"]
 # Example: "Hello, world! 123." -> ["Hello", "world", "123"]
 _WORD_RE = re.compile(r"\w+", re.UNICODE)
+# Same matches on pure-ASCII input ([A-Za-z0-9_]), but the engine skips Unicode category lookups.
+_ASCII_WORD_RE = re.compile(r"\w+", re.ASCII)
 
 
 def strip_code_blocks(text: str) -> str:
     """Remove markdown fenced code blocks (```...```)."""
     if not text:
         return ""
+    if "```" not in text:  # substring check in C; most comments have no fence, so skip the regex pass
+        return text
     return _CODE_BLOCK_RE.sub(" ", text)
 
 
@@ -46,14 +51,17 @@ def strip_diff_snippets(text: str) -> str:
     if not text:
         return ""
     lines = text.splitlines()
-    kept = [line for line in lines if not _DIFF_LINE_RE.match(line.strip())]
-    return "\n".join(kept)
+    if "+" not in text and "-" not in text:  # no candidate lines: skip the per-line test
+        return "\n".join(lines)
+    return "\n".join(line for line in lines if not line.lstrip().startswith(_DIFF_PREFIXES))
 
 
 def strip_images(text: str, placeholder: str = "<REDACTED IMAGE>") -> str:
     """Replace markdown images ![alt](url) and [image](url) with a placeholder (default: <REDACTED IMAGE>)."""
     if not text:
         return ""
+    if "](" not in text:  # both image forms need "](", so one C-level scan rules out both regex passes
+        return text
     t = _IMAGE_MD_RE.sub(placeholder, text)
     t = _IMAGE_LINK_RE.sub(placeholder, t)
     return t
@@ -68,7 +76,9 @@ def tokenize(text: str) -> List[str]:
     """Tokenize into words (CONFORMITY.md: tokenize). Simple word-boundary split."""
     if not text:
         return []
-    return _WORD_RE.findall(text.lower())
+    lowered = text.lower()
+    # isascii() is O(1) on str; checked after lower() since a few non-ASCII letters lowercase to ASCII.
+    return (_ASCII_WORD_RE if lowered.isascii() else _WORD_RE).findall(lowered)
 
 
 def clean_text(text: str) -> str:
@@ -78,6 +88,5 @@ def clean_text(text: str) -> str:
     t = strip_code_blocks(text)
     t = strip_diff_snippets(t)
     t = strip_images(t)
-    t = lowercase(t)
-    t = " ".join(t.split())
-    return t.strip()
+    # split() already drops leading/trailing whitespace, so no separate strip pass.
+    return " ".join(lowercase(t).split())
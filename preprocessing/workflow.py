@@ -4,9 +4,10 @@ Each step receives a Context and returns the (updated) context or None to drop t
 Use default_workflow() or build Workflow([...]) from exported steps; pass to CleanerPipeline(..., workflow=w).
 """
 from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional, Callable
+from functools import partial
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Callable
 
-from dataset_readers.gharchive.models import GitHubEvent
+from dataset_readers.gharchive.models import text_content_from_dict
 
 from preprocessing.filters import is_bot_or_ci
 from preprocessing.text_cleaner import (
@@ -17,10 +18,13 @@ from preprocessing.text_cleaner import (
     tokenize,
 )
 
+# Shared read-only default so lookups on missing sub-objects do not allocate a fresh {} each call.
+_EMPTY: Dict[str, Any] = {}
 
-@dataclass
+
+@dataclass(slots=True)
 class Context:
-    """Mutable context passed through the workflow. Steps read and update fields."""
+    """Mutable context passed through the workflow. Steps read and update fields (slots: fixed field set)."""
     event: Dict[str, Any]
     text: Optional[str] = None
     cleaned_text: Optional[str] = None
@@ -32,18 +36,14 @@ Step = Callable[[Context], Optional[Context]]
 
 
 def extract_text(ctx: Context) -> Optional[Context]:
-    """Extract comment/PR text from event (same logic as dataset reader)."""
-    try:
-        gh = GitHubEvent.from_dict(ctx.event)
-        ctx.text = gh.extract_text_content()
-    except (ValueError, KeyError):
-        ctx.text = None
+    """Extract comment/PR text from event (same logic as dataset reader, without building a GitHubEvent)."""
+    ctx.text = text_content_from_dict(ctx.event)
     return ctx if ctx.text and ctx.text.strip() else None
 
 
 def filter_bot(ctx: Context) -> Optional[Context]:
     """Drop events from bot/CI actors."""
-    actor = (ctx.event.get("actor") or {})
+    actor = ctx.event.get("actor") or _EMPTY
     return None if is_bot_or_ci(actor) else ctx
 
 
@@ -84,26 +84,24 @@ def filter_min_tokens(ctx: Context, min_tokens: int = 2) -> Optional[Context]:
 
 
 def finalize(ctx: Context) -> Optional[Context]:
-    """Add cleaned_text and tokens to event for output."""
-    out = dict(ctx.event)
-    out["cleaned_text"] = ctx.cleaned_text or ""
-    out["tokens"] = ctx.tokens
-    ctx.event = out
+    """Add cleaned_text and tokens to event for output (in place; Workflow.run owns the event dict)."""
+    ctx.event["cleaned_text"] = ctx.cleaned_text or ""
+    ctx.event["tokens"] = ctx.tokens
     return ctx
 
 
 def slim_output(ctx: Context) -> Optional[Context]:
     """Keep only pertinent fields: id, cleaned_text, repo, pr_number, event_type, created_at, author_association, tokens."""
     ev = ctx.event
-    repo = ev.get("repo") or {}
+    repo = ev.get("repo") or _EMPTY
     repo_name = repo.get("name", "") if isinstance(repo, dict) else ""
     event_type = ev.get("type") or ""
-    payload = ev.get("payload") or {}
+    payload = ev.get("payload") or _EMPTY
     if event_type == "IssueCommentEvent":
-        issue = payload.get("issue") or {}
+        issue = payload.get("issue") or _EMPTY
         pr_number = issue.get("number") if issue.get("pull_request") else None
     else:
-        pr_number = (payload.get("pull_request") or {}).get("number")
+        pr_number = (payload.get("pull_request") or _EMPTY).get("number")
     ctx.event = {
         "id": ev.get("id"),
         "cleaned_text": ctx.cleaned_text or ev.get("cleaned_text", ""),
@@ -124,14 +122,31 @@ class Workflow:
         self.steps = steps
 
     def run(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Run the workflow on one event. Returns updated event or None if dropped."""
-        ctx = Context(event=dict(event))
+        """
+        Run the workflow on one event. Returns updated event or None if dropped.
+        The dict is used as-is, not copied: steps such as finalize may modify it, so pass a copy if you reuse it.
+        """
+        ctx = Context(event=event)
         for step in self.steps:
             ctx = step(ctx)
             if ctx is None:
                 return None
         return ctx.event
 
+    def run_many(self, events: Iterable[Dict[str, Any]]) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Run the workflow over many events in one frame. Yields one result per input, in order:
+        the updated event, or None where it was dropped (same as calling run() on each).
+        """
+        steps = self.steps
+        for event in events:
+            ctx = Context(event=event)
+            for step in steps:
+                ctx = step(ctx)
+                if ctx is None:
+                    break
+            yield None if ctx is None else ctx.event
+
     def chain(self, *steps: Step) -> "Workflow":
         """Return a new workflow with additional steps appended (immutable)."""
         return Workflow(self.steps + list(steps))
@@ -147,35 +162,25 @@ def default_workflow(min_tokens: int = 1) -> Workflow:
         strip_diff,
         normalize_lowercase,
         tokenize_text,
-        lambda ctx: filter_min_tokens(ctx, min_tokens=min_tokens),
+        partial(filter_min_tokens, min_tokens=min_tokens),  # not a lambda: keeps the workflow picklable
         finalize,
         slim_output,
     ])
 
 # --- Helpers (not workflow steps) ---
 
+_ASSOCIATION_SOURCES = ("comment", "review", "pull_request", "issue")
+
+
 def _get_author_association(event: Dict[str, Any]) -> str:
-    """Extract author_association from payload (comment, review, or pull_request). Used by slim_output."""
-    payload = event.get("payload") or {}
-    return (
-        payload.get("comment", {}).get("author_association")
-        or payload.get("review", {}).get("author_association")
-        or payload.get("pull_request", {}).get("author_association")
-        or payload.get("issue", {}).get("author_association")
-        or ""
-    )
-
-
-def metadata_from_raw_event(event: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Extract repo, created_at, type, author_association from raw event_data.
-    Used when reading normalized cleaned (join with events) so we don't duplicate raw data.
-    """
-    repo = event.get("repo") or {}
-    repo_name = repo.get("name", "") if isinstance(repo, dict) else ""
-    return {
-        "repo": repo_name,
-        "created_at": event.get("created_at") or "",
-        "type": event.get("type") or "",
-        "author_association": _get_author_association(event),
-    }
+    """Extract author_association from payload (comment, review, pull_request, or issue). Used by slim_output."""
+    payload = event.get("payload")
+    if not payload:
+        return ""
+    for key in _ASSOCIATION_SOURCES:
+        obj = payload.get(key)
+        if obj:
+            association = obj.get("author_association")
+            if association:
+                return association
+    return ""